@@ -4,7 +4,8 @@ Merge (cruzamento) de dois arquivos Excel pela coluna 'MATRICULA'.
 
 Funcionalidades:
 - Lê dois arquivos Excel (planilhas opcionais personalizáveis)
-- Faz merge com how=outer e indicator=True, preservando todos os registros
+- Faz merge com how=outer preservando todos os registros (coluna '_merge'
+  opcional via --keep-indicator; o resumo traz as contagens sempre)
 - Padroniza a coluna-chave removendo espaços e convertendo para string
 - Gera arquivo Excel de saída com duas abas: 'merge' e 'summary'
 
@@ -17,17 +18,33 @@ Exemplo de uso:
 Requisitos:
     - pandas
     - openpyxl
+    - python-calamine (opcional, acelera a leitura dos arquivos)
+    - xlsxwriter (opcional, acelera a escrita do resultado)
 """
 
 from __future__ import annotations
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
+import numpy as np
 import pandas as pd
 
 
+def _positive_int(raw: str) -> int:
+    # Validador do argparse: um chunksize <= 0 geraria range() vazio (abas só
+    # com cabeçalho, perda silenciosa de dados) ou passo zero
+    try:
+        value = int(raw)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"valor inteiro inválido: '{raw}'")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"deve ser um inteiro >= 1 (recebido: {raw})")
+    return value
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description=(
@@ -60,20 +77,160 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Nome da planilha (sheet) no arquivo da direita (opcional)",
     )
+    parser.add_argument(
+        "--left-cols",
+        required=False,
+        default=None,
+        help=(
+            "Colunas a ler do arquivo da esquerda, separadas por vírgula "
+            "(a coluna-chave é sempre incluída; padrão: todas)"
+        ),
+    )
+    parser.add_argument(
+        "--chunksize",
+        required=False,
+        type=_positive_int,
+        default=50_000,
+        help=(
+            "Número de linhas convertidas e escritas por bloco na geração do "
+            "XLSX; limita o pico de memória da escrita (padrão: 50000)"
+        ),
+    )
+    parser.add_argument(
+        "--validate",
+        required=False,
+        default="m:m",
+        choices=["1:1", "1:m", "m:1", "m:m"],
+        help=(
+            "Cardinalidade esperada do merge; valores diferentes de 'm:m' "
+            "abortam cedo se houver chaves duplicadas, evitando explosões "
+            "cartesianas ('1:1' é o recomendado para dados de RH por "
+            "MATRICULA; padrão: m:m, sem checagem)"
+        ),
+    )
+    parser.add_argument(
+        "--keep-indicator",
+        action="store_true",
+        help=(
+            "Inclui a coluna '_merge' (both/left_only/right_only) na aba "
+            "'merge' da saída; sem a flag só o resumo traz as contagens, "
+            "poupando uma coluna inteira em RAM e no arquivo"
+        ),
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help=(
+            "Mantém um cache Parquet ao lado de cada .xlsx e o reutiliza "
+            "enquanto for mais novo que o arquivo original (acelera "
+            "execuções repetidas sobre os mesmos arquivos)"
+        ),
+    )
+    parser.add_argument(
+        "--engine",
+        required=False,
+        default="pandas",
+        choices=["pandas", "polars"],
+        help=(
+            "Motor do pipeline: 'polars' usa join multi-thread sobre colunas "
+            "Arrow (requer polars instalado; padrão: pandas)"
+        ),
+    )
+    parser.add_argument(
+        "--right-cols",
+        required=False,
+        default=None,
+        help=(
+            "Colunas a ler do arquivo da direita, separadas por vírgula "
+            "(a coluna-chave é sempre incluída; padrão: todas)"
+        ),
+    )
     return parser.parse_args()
 
 
-def read_excel(path: Path, sheet_name: Optional[str] = None) -> pd.DataFrame:
+def parse_columns_arg(raw: Optional[str], key: str) -> Optional[list[str]]:
+    # Converte "COL1, COL2" em ['MATRICULA', 'COL1', 'COL2'], garantindo a
+    # presença da coluna-chave e preservando a ordem informada
+    if not raw:
+        return None
+    cols = [col.strip() for col in raw.split(",") if col.strip()]
+    if key not in cols:
+        cols.insert(0, key)
+    return cols
+
+
+def _read_excel_openpyxl_stream(
+    path: Path, sheet_name: Optional[str] = None, usecols: Optional[list[str]] = None
+) -> pd.DataFrame:
+    # Fallback sem calamine: abre o workbook em modo read_only, que faz
+    # streaming das linhas (memória O(linha)) em vez de montar o modelo
+    # completo do openpyxl em RAM
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
     try:
-        if sheet_name:
-            df = pd.read_excel(path, sheet_name=sheet_name)
-        else:
-            df = pd.read_excel(path)
+        ws = wb[sheet_name] if sheet_name else wb[wb.sheetnames[0]]
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+        df = pd.DataFrame(rows, columns=list(header))
+        if usecols is not None:
+            df = df[[col for col in usecols if col in df.columns]]
+        return df
+    finally:
+        wb.close()
+
+
+def _cache_path_for(path: Path, sheet_name: Optional[str]) -> Path:
+    # 'dados.xlsx' -> 'dados.xlsx.cache.parquet': o nome completo do original
+    # mais o marcador .cache garante que o sidecar nunca colide com um
+    # .parquet legítimo do usuário (que seria lido/sobrescrito em silêncio)
+    if sheet_name:
+        return path.with_name(f"{path.name}.{sheet_name}.cache.parquet")
+    return path.with_name(f"{path.name}.cache.parquet")
+
+
+def read_excel(
+    path: Path,
+    sheet_name: Optional[str] = None,
+    usecols: Optional[list[str]] = None,
+    use_cache: bool = False,
+) -> pd.DataFrame:
+    cache_path = _cache_path_for(path, sheet_name)
+    if (
+        use_cache
+        and cache_path.exists()
+        and cache_path.stat().st_mtime >= path.stat().st_mtime
+    ):
+        try:
+            return pd.read_parquet(cache_path, columns=usecols)
+        except Exception:
+            pass  # cache inválido ou sem as colunas pedidas: reparse do xlsx
+
+    try:
+        # Prefere o engine 'calamine' (python-calamine), muito mais rápido e
+        # econômico em memória que o openpyxl para leitura de .xlsx
+        try:
+            df = pd.read_excel(
+                path, sheet_name=sheet_name or 0, usecols=usecols, engine="calamine"
+            )
+        except ImportError:
+            df = _read_excel_openpyxl_stream(path, sheet_name, usecols)
     except Exception as exc:
         raise RuntimeError(f"Falha ao ler '{path}': {exc}") from exc
 
     # Padroniza nomes de colunas: tira espaços nas pontas
     df.columns = [str(col).strip() for col in df.columns]
+
+    if use_cache and usecols is None:
+        # Cache é melhor esforço: só é gravado na leitura completa (para não
+        # salvar um subconjunto de colunas) e falhas não interrompem o merge
+        try:
+            df.to_parquet(cache_path)
+        except Exception:
+            pass
+
     return df
 
 
@@ -86,29 +243,418 @@ def ensure_key_column(df: pd.DataFrame, key: str) -> None:
 
 
 def normalize_key_column_as_string(df: pd.DataFrame, key: str) -> None:
-    # Converte a coluna-chave para string e remove espaços laterais
-    df[key] = df[key].astype(str).str.strip()
+    # Converte a coluna-chave para string e remove espaços laterais.
+    # Com PyArrow instalado o strip roda em kernels C sobre buffers UTF-8
+    # contíguos, em vez de um loop Python sobre strings objeto
+    col = df[key]
+    if pd.api.types.is_integer_dtype(col.dtype):
+        # Chave numérica (MATRICULA int em um dos arquivos): o cast
+        # int->string do Arrow roda inteiro em C, sem formatar elemento a
+        # elemento em Python — e inteiros nunca têm espaços para remover
+        try:
+            import pyarrow as pa
+            import pyarrow.compute as pc
+
+            df[key] = pd.array(
+                pc.cast(pa.Array.from_pandas(col), pa.string()),
+                dtype="string[pyarrow]",
+            )
+        except ImportError:
+            df[key] = col.astype(str)
+        return
+    if not isinstance(col.dtype, pd.StringDtype):
+        # Só paga a cópia da conversão quando a coluna ainda não é string
+        try:
+            col = col.astype("string[pyarrow]")
+        except ImportError:
+            col = col.astype(str)
+    df[key] = col.str.strip()
+
+
+def align_key_as_category(left_df: pd.DataFrame, right_df: pd.DataFrame, key: str) -> None:
+    # Converte as duas colunas-chave para Categorical com o MESMO conjunto de
+    # categorias: o merge passa a comparar códigos inteiros (int8/int16) em vez
+    # de refazer o hash de strings Python, o que é menor e mais rápido.
+    # Categorias não aceitam nulos; células vazias de MATRICULA viram NaN no
+    # Categorical (código -1) e seguem o tratamento de NaN do merge
+    cats = pd.Index(left_df[key]).union(pd.Index(right_df[key])).unique().dropna()
+    left_df[key] = pd.Categorical(left_df[key], categories=cats)
+    right_df[key] = pd.Categorical(right_df[key], categories=cats)
+
+
+def merge_outer_with_indicator(
+    left_df: pd.DataFrame,
+    right_df: pd.DataFrame,
+    key: str,
+    validate: str = "m:m",
+    indicator: bool = True,
+) -> pd.DataFrame:
+    """Merge outer com indicador equivalente a pd.merge(indicator=True).
+
+    Quando a chave é única nos dois lados (o caso normal de MATRICULA), o
+    resultado é montado por sondagem direta sobre a união das chaves: uma
+    única passada de posicionamento por lado, sem construir as duas tabelas
+    hash do pd.merge nem alocar o indicador via conversão de objetos. Com
+    chaves duplicadas (merge m:m genuíno) ou chaves nulas, delega ao
+    pd.merge, que já tem a semântica certa para NaN (NaN casa com NaN).
+    """
+    left_keys = left_df[key]
+    right_keys = right_df[key]
+
+    # Sufixos só são necessários quando os dois lados repetem alguma coluna
+    # além da chave; sem sobreposição, evitamos o rename de todos os nomes
+    # (e colisões com colunas do usuário que já terminem em _left/_right)
+    has_overlap = bool((set(left_df.columns) & set(right_df.columns)) - {key})
+
+    aligned_categories = (
+        isinstance(left_keys.dtype, pd.CategoricalDtype)
+        and left_keys.dtype == right_keys.dtype
+    )
+    suffixes = ("_left", "_right") if has_overlap else ("", "")
+
+    # Chaves nulas viram código -1 no Categorical e corromperiam o scatter de
+    # posições do caminho rápido; o pd.merge já as trata corretamente
+    has_nulls = left_keys.hasnans or right_keys.hasnans
+
+    if has_nulls or not (left_keys.is_unique and right_keys.is_unique):
+        # Com chave única dos dois lados qualquer cardinalidade é satisfeita;
+        # só o caminho com duplicatas precisa do validate do pd.merge
+        if aligned_categories:
+            # Categorias unificadas: o pd.merge já junta pelos códigos int
+            return pd.merge(
+                left_df,
+                right_df,
+                on=key,
+                how="outer",
+                indicator=indicator,
+                suffixes=suffixes,
+                validate=validate,
+            )
+        # Chaves string soltas: fatoriza os dois lados contra um codebook
+        # único e faz o merge sobre os códigos int64 — uma única passada de
+        # hash em vez de uma por lado dentro do pd.merge
+        codebook = pd.Index(left_keys).union(pd.Index(right_keys)).unique()
+        left_tmp = left_df.drop(columns=[key])
+        right_tmp = right_df.drop(columns=[key])
+        left_tmp["_k"] = codebook.get_indexer(left_keys)
+        right_tmp["_k"] = codebook.get_indexer(right_keys)
+        merged = pd.merge(
+            left_tmp,
+            right_tmp,
+            on="_k",
+            how="outer",
+            indicator=indicator,
+            suffixes=suffixes,
+            validate=validate,
+        )
+        merged.insert(
+            left_df.columns.get_loc(key),
+            key,
+            # allow_fill: código -1 (chave nula) volta como NaN, não como o
+            # último elemento do codebook
+            codebook.take(merged["_k"], allow_fill=True, fill_value=np.nan),
+        )
+        return merged.drop(columns=["_k"])
+
+    if aligned_categories:
+        # Categorias já unificadas (align_key_as_category): os códigos são as
+        # próprias posições na união — nenhum hash adicional necessário
+        keys = left_keys.cat.categories
+        li = left_keys.cat.codes.to_numpy()
+        ri = right_keys.cat.codes.to_numpy()
+    else:
+        keys = pd.Index(left_keys).union(pd.Index(right_keys))
+        li = keys.get_indexer(left_keys)
+        ri = keys.get_indexer(right_keys)
+
+    # Posição de cada chave da união em cada lado (-1 = ausente)
+    left_pos = np.full(len(keys), -1, dtype=np.int64)
+    left_pos[li] = np.arange(len(left_df))
+    right_pos = np.full(len(keys), -1, dtype=np.int64)
+    right_pos[ri] = np.arange(len(right_df))
+
+    left_block = left_df.drop(columns=[key]).reset_index(drop=True).reindex(left_pos)
+    right_block = right_df.drop(columns=[key]).reset_index(drop=True).reindex(right_pos)
+    left_block.index = right_block.index = pd.RangeIndex(len(keys))
+
+    shared = set(left_block.columns) & set(right_block.columns)
+    if shared:
+        left_block = left_block.rename(columns={col: f"{col}_left" for col in shared})
+        right_block = right_block.rename(columns={col: f"{col}_right" for col in shared})
+
+    merged = pd.concat([left_block, right_block], axis=1)
+    merged.insert(left_df.columns.get_loc(key), key, pd.Categorical(keys))
+
+    if indicator:
+        left_present = left_pos >= 0
+        right_present = right_pos >= 0
+        labels = np.where(
+            left_present & right_present,
+            "both",
+            np.where(left_present, "left_only", "right_only"),
+        )
+        merged["_merge"] = pd.Categorical(
+            labels, categories=["left_only", "right_only", "both"]
+        )
+    return merged
+
+
+def merge_with_polars(
+    left_path: Path,
+    right_path: Path,
+    key: str,
+    left_sheet: Optional[str] = None,
+    right_sheet: Optional[str] = None,
+    left_cols: Optional[list[str]] = None,
+    right_cols: Optional[list[str]] = None,
+    validate: str = "m:m",
+) -> pd.DataFrame:
+    """Pipeline alternativo em Polars: leitura, strip da chave e join full.
+
+    O join do Polars é um hash join multi-thread sobre colunas Arrow, que
+    fatoriza chaves string nativamente. O resultado volta como DataFrame
+    pandas (com a coluna '_merge' usual) para reaproveitar o resumo e os
+    writers existentes.
+    """
+    try:
+        import polars as pl
+    except ImportError as exc:
+        raise RuntimeError(
+            "Engine 'polars' requer o pacote polars (pip install polars)"
+        ) from exc
+
+    def load(path: Path, sheet: Optional[str], cols: Optional[list[str]]) -> "pl.DataFrame":
+        try:
+            df = pl.read_excel(path, sheet_name=sheet, columns=cols)
+        except Exception as exc:
+            raise RuntimeError(f"Falha ao ler '{path}': {exc}") from exc
+        df = df.rename({col: str(col).strip() for col in df.columns})
+        if key not in df.columns:
+            available = ", ".join(df.columns)
+            raise KeyError(
+                f"Coluna-chave '{key}' não encontrada. Colunas disponíveis: {available}"
+            )
+        return df.with_columns(pl.col(key).cast(pl.Utf8).str.strip_chars())
+
+    left = load(left_path, left_sheet, left_cols)
+    right = load(right_path, right_sheet, right_cols)
+
+    # Mesma convenção de sufixos do caminho pandas para colunas repetidas
+    shared = (set(left.columns) & set(right.columns)) - {key}
+    if shared:
+        left = left.rename({col: f"{col}_left" for col in shared})
+        right = right.rename({col: f"{col}_right" for col in shared})
+
+    left = left.with_columns(pl.lit(True).alias("_left_present"))
+    right = right.with_columns(pl.lit(True).alias("_right_present"))
+
+    # nulls_equal=True reproduz a semântica do pd.merge (NaN casa com NaN);
+    # o padrão do polars deixaria chaves vazias sempre sem par
+    merged = left.join(
+        right, on=key, how="full", coalesce=True, validate=validate, nulls_equal=True
+    ).sort(key)
+    merged = merged.with_columns(
+        pl.when(pl.col("_left_present") & pl.col("_right_present"))
+        .then(pl.lit("both"))
+        .when(pl.col("_left_present"))
+        .then(pl.lit("left_only"))
+        .otherwise(pl.lit("right_only"))
+        .alias("_merge")
+    ).drop(["_left_present", "_right_present"])
+
+    df_merged = merged.to_pandas()
+    df_merged["_merge"] = pd.Categorical(
+        df_merged["_merge"], categories=["left_only", "right_only", "both"]
+    )
+    return df_merged
+
+
+# Ordem de exibição do resumo; como Categorical ordenado, qualquer sort
+# posterior sobre 'categoria' compara códigos int8, sem strings nem lambdas
+_SUMMARY_CATEGORIES = ["both", "left_only", "right_only"]
+
+
+def _summary_frame(quantities: list[int]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "categoria": pd.Categorical(
+                _SUMMARY_CATEGORIES, categories=_SUMMARY_CATEGORIES, ordered=True
+            ),
+            "quantidade": quantities,
+        }
+    )
+
+
+def build_summary_from_keys(left_keys: pd.Series, right_keys: pd.Series) -> pd.DataFrame:
+    # Contagens both/left_only/right_only direto das chaves fatorizadas, sem
+    # materializar uma coluna '_merge' por linha; para m:m o produto das
+    # contagens por chave reproduz o número de linhas do merge outer
+    if (
+        isinstance(left_keys.dtype, pd.CategoricalDtype)
+        and left_keys.dtype == right_keys.dtype
+    ):
+        n_keys = len(left_keys.cat.categories)
+        li = left_keys.cat.codes.to_numpy()
+        ri = right_keys.cat.codes.to_numpy()
+    else:
+        union = pd.Index(left_keys).union(pd.Index(right_keys)).unique()
+        n_keys = len(union)
+        li = union.get_indexer(left_keys)
+        ri = union.get_indexer(right_keys)
+    # Chaves nulas (código -1) contam como um balde próprio, igual ao
+    # indicador do pd.merge: NaN casa com NaN (both) e, sozinho de um lado,
+    # conta como left_only/right_only
+    li = np.where(li < 0, n_keys, li)
+    ri = np.where(ri < 0, n_keys, ri)
+    left_counts = np.bincount(li, minlength=n_keys + 1)
+    right_counts = np.bincount(ri, minlength=n_keys + 1)
+    return _summary_frame(
+        [
+            int((left_counts * right_counts).sum()),
+            int(left_counts[right_counts == 0].sum()),
+            int(right_counts[left_counts == 0].sum()),
+        ]
+    )
 
 
 def build_summary(df_merged: pd.DataFrame) -> pd.DataFrame:
-    counts = df_merged["_merge"].value_counts(dropna=False).rename_axis("categoria").reset_index(name="quantidade")
-    # Ordena por categoria para uma visualização consistente
-    category_order = {"both": 0, "left_only": 1, "right_only": 2}
-    counts["ord"] = counts["categoria"].map(lambda c: category_order.get(c, 99))
-    counts = counts.sort_values(["ord", "categoria"]).drop(columns=["ord"]).reset_index(drop=True)
-    return counts
+    # '_merge' é um Categorical com categorias fixas (left_only, right_only,
+    # both): basta um bincount sobre os códigos int8, sem value_counts nem sort
+    codes = df_merged["_merge"].cat.codes.to_numpy()
+    counts = np.bincount(codes[codes >= 0], minlength=3)
+    return _summary_frame([int(counts[2]), int(counts[0]), int(counts[1])])
+
+
+DEFAULT_CHUNKSIZE = 50_000
+
+
+def _stream_rows(
+    df: pd.DataFrame,
+    append_row: Callable[[int, list], None],
+    chunk_rows: int = DEFAULT_CHUNKSIZE,
+) -> None:
+    # Pipeline em duas etapas: uma thread converte o próximo bloco do
+    # DataFrame em listas de células (NaN/NA viram célula vazia, como no
+    # to_excel) enquanto a thread principal serializa o bloco anterior para
+    # XML — a conversão e a escrita se sobrepõem no tempo
+    if chunk_rows < 1:
+        # range() com passo <= 0 escreveria abas só com cabeçalho (ou quebraria)
+        raise ValueError(f"chunk_rows deve ser >= 1 (recebido: {chunk_rows})")
+
+    def build(start: int) -> list[list]:
+        block = df.iloc[start : start + chunk_rows]
+        return [
+            [None if pd.isna(value) else value for value in row]
+            for row in block.itertuples(index=False, name=None)
+        ]
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(build, 0)
+        for start in range(0, len(df), chunk_rows):
+            rows = future.result()
+            next_start = start + chunk_rows
+            if next_start < len(df):
+                future = executor.submit(build, next_start)
+            for offset, row in enumerate(rows):
+                # +1 pula a linha de cabeçalho
+                append_row(start + offset + 1, row)
+
+
+def _append_dataframe_sheet(
+    wb, title: str, df: pd.DataFrame, chunk_rows: int = DEFAULT_CHUNKSIZE
+) -> None:
+    ws = wb.create_sheet(title)
+    ws.append([str(col) for col in df.columns])
+    _stream_rows(df, lambda _row_idx, row: ws.append(row), chunk_rows)
+
+
+def _write_workbook_openpyxl(
+    df_merged: pd.DataFrame,
+    df_summary: pd.DataFrame,
+    output_path: Path,
+    chunk_rows: int = DEFAULT_CHUNKSIZE,
+) -> None:
+    # Workbook write_only faz streaming das linhas direto para o arquivo,
+    # sem montar a grade de células do openpyxl nem passar pelo caminho
+    # célula a célula do DataFrame.to_excel
+    import openpyxl
+
+    wb = openpyxl.Workbook(write_only=True)
+    _append_dataframe_sheet(wb, "merge", df_merged, chunk_rows)
+    _append_dataframe_sheet(wb, "summary", df_summary, chunk_rows)
+    wb.save(output_path)
+
+
+def _write_workbook_xlsxwriter(
+    df_merged: pd.DataFrame,
+    df_summary: pd.DataFrame,
+    output_path: Path,
+    chunk_rows: int = DEFAULT_CHUNKSIZE,
+) -> None:
+    # constant_memory descarrega cada linha para disco assim que escrita:
+    # memória do writer fica O(1) no número de linhas
+    import xlsxwriter
+
+    wb = xlsxwriter.Workbook(
+        str(output_path),
+        {"constant_memory": True, "default_date_format": "yyyy-mm-dd hh:mm:ss"},
+    )
+    try:
+        for title, df in (("merge", df_merged), ("summary", df_summary)):
+            ws = wb.add_worksheet(title)
+            ws.write_row(0, 0, [str(col) for col in df.columns])
+            _stream_rows(df, lambda row_idx, row, ws=ws: ws.write_row(row_idx, 0, row), chunk_rows)
+    finally:
+        wb.close()
+
+
+def save_to_parquet(df_merged: pd.DataFrame, df_summary: pd.DataFrame, output_path: Path) -> None:
+    # Saída colunar comprimida: ordens de magnitude mais rápida que XLSX para
+    # frames grandes. O resumo vai em um arquivo irmão '<nome>_summary.<ext>'
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    summary_path = output_path.with_name(f"{output_path.stem}_summary{output_path.suffix}")
+    try:
+        if output_path.suffix.lower() == ".feather":
+            df_merged.to_feather(output_path)
+            df_summary.to_feather(summary_path)
+        else:
+            df_merged.to_parquet(output_path, compression="zstd")
+            df_summary.to_parquet(summary_path, compression="zstd")
+    except Exception as exc:
+        raise RuntimeError(f"Falha ao salvar em '{output_path}': {exc}") from exc
 
 
-def save_to_excel(df_merged: pd.DataFrame, df_summary: pd.DataFrame, output_path: Path) -> None:
+def save_to_excel(
+    df_merged: pd.DataFrame,
+    df_summary: pd.DataFrame,
+    output_path: Path,
+    chunk_rows: int = DEFAULT_CHUNKSIZE,
+) -> None:
     output_path.parent.mkdir(parents=True, exist_ok=True)
     try:
-        with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
-            df_merged.to_excel(writer, sheet_name="merge", index=False)
-            df_summary.to_excel(writer, sheet_name="summary", index=False)
+        # xlsxwriter é ~2x mais rápido que o openpyxl na escrita em escala;
+        # o caminho write_only do openpyxl continua como fallback
+        try:
+            _write_workbook_xlsxwriter(df_merged, df_summary, output_path, chunk_rows)
+        except ImportError:
+            _write_workbook_openpyxl(df_merged, df_summary, output_path, chunk_rows)
     except Exception as exc:
         raise RuntimeError(f"Falha ao salvar Excel em '{output_path}': {exc}") from exc
 
 
+def save_output(
+    df_merged: pd.DataFrame,
+    df_summary: pd.DataFrame,
+    output_path: Path,
+    chunk_rows: int = DEFAULT_CHUNKSIZE,
+) -> None:
+    # Formato decidido pela extensão do --output; XLSX continua o padrão
+    if output_path.suffix.lower() in (".parquet", ".feather"):
+        save_to_parquet(df_merged, df_summary, output_path)
+    else:
+        save_to_excel(df_merged, df_summary, output_path, chunk_rows)
+
+
 def main() -> None:
     args = parse_args()
 
@@ -122,26 +668,60 @@ def main() -> None:
     if not right_path.exists():
         raise FileNotFoundError(f"Arquivo não encontrado: {right_path}")
 
-    left_df = read_excel(left_path, args.left_sheet)
-    right_df = read_excel(right_path, args.right_sheet)
-
-    ensure_key_column(left_df, key_column)
-    ensure_key_column(right_df, key_column)
-
-    normalize_key_column_as_string(left_df, key_column)
-    normalize_key_column_as_string(right_df, key_column)
-
-    merged_df = pd.merge(
-        left_df,
-        right_df,
-        on=key_column,
-        how="outer",
-        indicator=True,
-        suffixes=("_left", "_right"),
-    )
+    left_cols = parse_columns_arg(args.left_cols, key_column)
+    right_cols = parse_columns_arg(args.right_cols, key_column)
+
+    if args.engine == "polars":
+        merged_df = merge_with_polars(
+            left_path,
+            right_path,
+            key_column,
+            args.left_sheet,
+            args.right_sheet,
+            left_cols,
+            right_cols,
+            validate=args.validate,
+        )
+    else:
+        # As duas leituras são independentes; openpyxl/calamine liberam o GIL
+        # no parsing, então ler em paralelo ~dobra a fase de leitura
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            left_future = executor.submit(
+                read_excel, left_path, args.left_sheet, left_cols, use_cache=args.cache
+            )
+            right_future = executor.submit(
+                read_excel, right_path, args.right_sheet, right_cols, use_cache=args.cache
+            )
+            left_df = left_future.result()
+            right_df = right_future.result()
+
+        ensure_key_column(left_df, key_column)
+        ensure_key_column(right_df, key_column)
+
+        normalize_key_column_as_string(left_df, key_column)
+        normalize_key_column_as_string(right_df, key_column)
+
+        align_key_as_category(left_df, right_df, key_column)
+
+        merged_df = merge_outer_with_indicator(
+            left_df,
+            right_df,
+            key_column,
+            validate=args.validate,
+            indicator=args.keep_indicator,
+        )
 
-    summary_df = build_summary(merged_df)
-    save_to_excel(merged_df, summary_df, output_path)
+    if args.keep_indicator:
+        summary_df = build_summary(merged_df)
+    elif args.engine == "polars":
+        # O caminho polars sempre deriva o indicador; aproveita para o resumo
+        # e descarta a coluna antes de salvar
+        summary_df = build_summary(merged_df)
+        merged_df = merged_df.drop(columns=["_merge"])
+    else:
+        summary_df = build_summary_from_keys(left_df[key_column], right_df[key_column])
+
+    save_output(merged_df, summary_df, output_path, chunk_rows=args.chunksize)
 
     print(
         f"Merge concluído com sucesso. Linhas: {len(merged_df)} | Saída: '{output_path.resolve()}'"